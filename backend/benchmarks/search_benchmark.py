@@ -0,0 +1,117 @@
+"""Latency benchmark for GET /conversations/search.
+
+Seeds one synthetic user with tens of thousands of message_index rows, then
+times search_conversations for a rare and a common term on the first page and
+on a deep page. Needs a running MongoDB at MONGO_DB_URL; from backend/ run:
+
+    python benchmarks/search_benchmark.py --messages 30000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from configs.db import connect_db, close_db
+from controllers.conversation_controller import ensure_message_index, search_conversations, _message_index_entry
+
+RARE_TERM = "lighthouse"
+COMMON_TERM = "feeling"
+FILLER = (
+    "today work sleep friends family stress calm walk music tired better worse talk breathe morning evening "
+    "anxious worried hopeful quiet busy weekend school partner therapy journal coffee rain panic relief"
+).split()
+TARGET_MS = 100
+
+
+def _synthetic_text(rng: random.Random):
+    words = rng.choices(FILLER, k=rng.randint(8, 30))
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(len(words)), COMMON_TERM)
+    if rng.random() < 0.001:
+        words.insert(rng.randrange(len(words)), RARE_TERM)
+    return " ".join(words)
+
+
+async def seed(user_id: str, messages: int, per_conversation: int, rng: random.Random):
+    db = await connect_db()
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for offset_total in range(messages):
+        conversation_number, offset = divmod(offset_total, per_conversation)
+        conversation = {
+            "user_id": user_id,
+            "conversation_id": f"{user_id}-{conversation_number}",
+            "title": f"Benchmark conversation {conversation_number}"
+        }
+        message = {"role": "user" if offset % 2 == 0 else "assistant", "text": _synthetic_text(rng)}
+        batch.append(_message_index_entry(conversation, offset, message, start + timedelta(minutes=offset_total)))
+        if len(batch) == 5000:
+            await db.message_index.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.message_index.insert_many(batch, ordered=False)
+
+
+async def time_search(user_id: str, query: str, page: int, page_size: int, runs: int):
+    timings = []
+    for run in range(runs + 1):
+        # search_conversations logs every call; keep that out of the output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = await search_conversations(user_id, query, page, page_size)
+            elapsed = (time.perf_counter() - started) * 1000
+        if run > 0:  # first run is a warm-up
+            timings.append(elapsed)
+    timings.sort()
+    p50 = timings[int(0.50 * (len(timings) - 1))]
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    return p50, p95, len(result["hits"])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=30000)
+    parser.add_argument("--per-conversation", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="leave the synthetic rows in message_index")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("MONGO_DB_URL"):
+        sys.exit("MONGO_DB_URL is not set")
+
+    user_id = f"benchmark-{uuid.uuid4()}"
+    failed = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await ensure_message_index()
+            await seed(user_id, args.messages, args.per_conversation, random.Random(42))
+        print(f"Seeded {args.messages} messages for {user_id}")
+        print(f"{'query':<12}{'page':>6}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}")
+        for query in (RARE_TERM, COMMON_TERM):
+            for page in (1, args.deep_page):
+                p50, p95, hits = await time_search(user_id, query, page, args.page_size, args.runs)
+                failed = failed or p95 >= TARGET_MS
+                print(f"{query:<12}{page:>6}{hits:>6}{p50:>10.1f}{p95:>10.1f}{'' if p95 < TARGET_MS else '  SLOW'}")
+    finally:
+        if not args.keep:
+            with contextlib.redirect_stdout(io.StringIO()):
+                db = await connect_db()
+                await db.message_index.delete_many({"user_id": user_id})
+        await close_db()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,10 +7,11 @@ mongo_client = None
 async def connect_db():
     global mongo_client
     try:
-        mongo_client = AsyncIOMotorClient(os.getenv("MONGO_DB_URL"))
-        db = mongo_client.get_database("auth-project")
-        print("MongoDB Connected successfully")
-        return db
+        # Reuse one client (and its connection pool) across requests.
+        if mongo_client is None:
+            mongo_client = AsyncIOMotorClient(os.getenv("MONGO_DB_URL"))
+            print("MongoDB Connected successfully")
+        return mongo_client.get_database("auth-project")
     except Exception as e:
         print(f"Error connecting to MongoDB: {str(e)}")
         raise
@@ -19,4 +20,5 @@ async def close_db():
     global mongo_client
     if mongo_client:
         mongo_client.close()
+        mongo_client = None
         print("MongoDB connection closed")
\ No newline at end of file
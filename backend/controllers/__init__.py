@@ -1,4 +1,4 @@
 from .auth_controller import register_user, login_user
-from .conversation_controller import get_conversations, get_conversation, add_message, new_conversation
+from .conversation_controller import get_conversations, get_conversation, add_message, new_conversation, search_conversations
 from .mood_controller import log_mood, get_mood_history, get_coping_tool
 from .crisis_controller import handle_crisis, get_emergency_contacts, save_emergency_contacts, delete_emergency_contact
\ No newline at end of file
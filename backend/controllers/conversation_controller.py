@@ -2,12 +2,113 @@ from fastapi import HTTPException, status
 from configs.db import connect_db
 from models.conversation_models import Conversation, Message
 import uuid
+import re
+import html
+import snowballstemmer
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, TEXT, ReturnDocument, UpdateOne
+
+# MongoDB's English text index ignores these, so they are never highlighted either.
+_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor not now of off on once only or other
+our ours ourselves out over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves
+""".split())
+
+_STEMMER = snowballstemmer.stemmer("english")
+
+async def ensure_message_index():
+    db = await connect_db()
+    # Compound text index: every search is an equality match on user_id, so the
+    # index only ever scans one user's messages.
+    await db.message_index.create_index([("user_id", ASCENDING), ("text", TEXT)], name="user_message_text")
+    await db.message_index.create_index([("conversation_id", ASCENDING), ("message_offset", ASCENDING)], unique=True)
+    print("Message search index ready")
+
+async def backfill_message_index():
+    db = await connect_db()
+    backfilled, failed = 0, 0
+    async for conversation in db.conversations.find({"messages_indexed": {"$ne": True}}):
+        try:
+            messages = conversation.get("messages", [])
+            if messages:
+                await db.message_index.bulk_write([
+                    _message_index_upsert(_message_index_entry(conversation, offset, msg, conversation.get("created_at")))
+                    for offset, msg in enumerate(messages)
+                ], ordered=False)
+            # Only mark the conversation done if no message was added meanwhile;
+            # otherwise it is picked up again on the next backfill.
+            await db.conversations.update_one(
+                {"_id": conversation["_id"], "messages": {"$size": len(messages)}},
+                {"$set": {"messages_indexed": True}}
+            )
+            backfilled += 1
+        except Exception as e:
+            failed += 1
+            print(f"Error indexing conversation {conversation.get('conversation_id')}: {str(e)}")
+    print(f"Message search backfill completed: {backfilled} conversation(s) indexed, {failed} failed")
+
+def _message_index_entry(conversation: dict, offset: int, message: dict, created_at: datetime):
+    return {
+        "user_id": conversation["user_id"],
+        "conversation_id": conversation["conversation_id"],
+        "title": conversation.get("title"),
+        "message_offset": offset,
+        "role": message.get("role"),
+        "text": message.get("text", ""),
+        "created_at": created_at
+    }
+
+def _message_index_upsert(entry: dict):
+    return UpdateOne(
+        {"conversation_id": entry["conversation_id"], "message_offset": entry["message_offset"]},
+        {"$set": entry},
+        upsert=True
+    )
+
+def _stem(word: str):
+    # Same Snowball English stemmer as MongoDB's text index, so a word the index
+    # matched is also the word that gets highlighted.
+    return _STEMMER.stemWord(word.lower())
+
+def _parse_search(query: str):
+    phrases = [phrase for negated, phrase in re.findall(r'(-?)"([^"]*)"', query) if not negated and phrase.strip()]
+    stems = set()
+    for token in re.sub(r'-?"[^"]*"?', " ", query).split():
+        if token.startswith("-"):
+            continue
+        stems.update(_stem(word) for word in re.findall(r"\w+", token) if word.lower() not in _STOPWORDS)
+    return phrases, stems
+
+def _highlight(text: str, query: str):
+    phrases, stems = _parse_search(query)
+    spans = []
+    for phrase in phrases:
+        pattern = r"\s+".join(re.escape(word) for word in phrase.split())
+        spans += [(m.start(), m.end()) for m in re.finditer(pattern, text, re.IGNORECASE)]
+    spans += [(m.start(), m.end()) for m in re.finditer(r"\w+", text) if _stem(m.group(0)) in stems]
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    # Message text is user/LLM content, so escape it before adding markup.
+    parts, last = [], 0
+    for start, end in merged:
+        parts.append(html.escape(text[last:start]))
+        parts.append(f"<mark>{html.escape(text[start:end])}</mark>")
+        last = end
+    parts.append(html.escape(text[last:]))
+    return "".join(parts), merged
 
 async def get_conversations(user_id: str):
     db = await connect_db()
-    conversations = await db.conversations.find({"user_id": user_id}).sort("created_at", -1).to_list(100)
+    conversations = await db.conversations.find({"user_id": user_id}, {"messages_indexed": 0}).sort("created_at", -1).to_list(100)
     print(f"Retrieved {len(conversations)} conversations for user {user_id}")
     serialized_conversations = []
     for doc in conversations:
@@ -19,7 +120,7 @@ async def get_conversations(user_id: str):
 
 async def get_conversation(conversation_id: str, user_id: str):
     db = await connect_db()
-    conversation = await db.conversations.find_one({"conversation_id": conversation_id, "user_id": user_id})
+    conversation = await db.conversations.find_one({"conversation_id": conversation_id, "user_id": user_id}, {"messages_indexed": 0})
     if not conversation:
         raise HTTPException(status_code=404, detail={"message": "Conversation not found", "success": False, "error": True})
     conversation["_id"] = str(conversation["_id"])
@@ -29,15 +130,27 @@ async def get_conversation(conversation_id: str, user_id: str):
 
 async def add_message(conversation_id: str, user_id: str, message: Message):
     db = await connect_db()
-    conversation = await db.conversations.find_one({"conversation_id": conversation_id, "user_id": user_id})
-    if not conversation:
-        raise HTTPException(status_code=404, detail={"message": "Conversation not found", "success": False, "error": True})
-    conversation["messages"].append(message.dict())
-    result = await db.conversations.update_one(
+    now = datetime.utcnow()
+    # $push is atomic, so concurrent sends each get their own message offset.
+    conversation = await db.conversations.find_one_and_update(
         {"conversation_id": conversation_id, "user_id": user_id},
-        {"$set": {"messages": conversation["messages"], "created_at": datetime.utcnow()}}
+        {"$push": {"messages": message.dict()}, "$set": {"created_at": now}},
+        return_document=ReturnDocument.AFTER
     )
-    print(f"Updated conversation {conversation_id}: {result.modified_count} document(s) modified")
+    if not conversation:
+        raise HTTPException(status_code=404, detail={"message": "Conversation not found", "success": False, "error": True})
+    offset = len(conversation["messages"]) - 1
+    try:
+        await db.message_index.update_one(
+            {"conversation_id": conversation_id, "message_offset": offset},
+            {"$set": _message_index_entry(conversation, offset, message.dict(), now)},
+            upsert=True
+        )
+    except Exception as e:
+        # The message is stored; flag the conversation so the backfill re-indexes it.
+        print(f"Error indexing message {offset} of conversation {conversation_id}: {str(e)}")
+        await db.conversations.update_one({"_id": conversation["_id"]}, {"$set": {"messages_indexed": False}})
+    print(f"Updated conversation {conversation_id}: message added at offset {offset}")
     return {"message": "Message added", "success": True, "error": False}
 
 async def new_conversation(user_id: str, title: str):
@@ -48,8 +161,41 @@ async def new_conversation(user_id: str, title: str):
         "conversation_id": conversation_id,
         "title": title,
         "messages": [],
+        "messages_indexed": True,
         "created_at": datetime.utcnow()
     }
     result = await db.conversations.insert_one(new_conversation)
     print(f"Inserted conversation with ID: {result.inserted_id}")
-    return {"message": "New conversation created", "success": True, "error": False, "conversation_id": conversation_id}
\ No newline at end of file
+    return {"message": "New conversation created", "success": True, "error": False, "conversation_id": conversation_id}
+
+async def search_conversations(user_id: str, query: str, page: int = 1, page_size: int = 20):
+    if not query.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Search query is required", "success": False, "error": True})
+    db = await connect_db()
+    search_filter = {"user_id": user_id, "$text": {"$search": query}}
+    # No count_documents: a total would make the server score every match a second
+    # time. Fetching one extra row is enough to tell the client whether to page on.
+    docs = await (
+        db.message_index.find(search_filter, {"score": {"$meta": "textScore"}})
+        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)])
+        .skip((page - 1) * page_size)
+        .limit(page_size + 1)
+        .to_list(page_size + 1)
+    )
+    has_more = len(docs) > page_size
+    hits = []
+    for doc in docs[:page_size]:
+        highlighted, spans = _highlight(doc["text"], query)
+        hits.append({
+            "conversation_id": doc["conversation_id"],
+            "title": doc.get("title"),
+            "message_offset": doc["message_offset"],
+            "role": doc.get("role"),
+            "text": doc["text"],
+            "highlighted_text": highlighted,
+            "highlights": spans,
+            "score": doc["score"],
+            "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None
+        })
+    print(f"Search for user {user_id} returned {len(hits)} hit(s) on page {page}")
+    return {"message": "Search results retrieved", "success": True, "error": False, "query": query, "page": page, "page_size": page_size, "has_more": has_more, "hits": hits}
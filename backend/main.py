@@ -3,8 +3,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
+import asyncio
 from configs.db import connect_db, close_db
 from routes import auth_routes, chatbot_routes, mood_routes, conversation_routes
+from controllers.conversation_controller import ensure_message_index, backfill_message_index
 from chatbot.chatbot import initialize_chatbot
 
 load_dotenv()
@@ -13,12 +15,16 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     try:
         await connect_db()
+        await ensure_message_index()
+        # Index pre-existing conversations without holding up startup.
+        backfill_task = asyncio.create_task(backfill_message_index())
         initialize_chatbot()
         print("Application startup completed")
     except Exception as e:
         print(f"Startup error: {str(e)}")
         raise
     yield
+    backfill_task.cancel()
     await close_db()
     print("Application shutdown completed")
 
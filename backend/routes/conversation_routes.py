@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from controllers.conversation_controller import get_conversations, get_conversation, add_message, new_conversation
+from fastapi import APIRouter, Depends, HTTPException, Query
+from controllers.conversation_controller import get_conversations, get_conversation, add_message, new_conversation, search_conversations
 from models.conversation_models import Message
 from middlewares.auth_middleware import ensure_authenticated
 
@@ -9,6 +9,15 @@ router = APIRouter()
 async def list_conversations(user: dict = Depends(ensure_authenticated)):
     return await get_conversations(str(user["_id"]))
 
+@router.get("/search")
+async def search_conversation_history(
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1, le=500),
+    page_size: int = Query(20, ge=1, le=100),
+    user: dict = Depends(ensure_authenticated)
+):
+    return await search_conversations(str(user["_id"]), q, page, page_size)
+
 @router.get("/{conversation_id}")
 async def retrieve_conversation(conversation_id: str, user: dict = Depends(ensure_authenticated)):
     return await get_conversation(conversation_id, str(user["_id"]))
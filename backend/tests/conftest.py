@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its packages from backend/ (e.g. `from configs.db import ...`).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,63 @@
+import pytest
+from controllers.conversation_controller import _stem, _parse_search, _highlight
+
+
+@pytest.mark.parametrize("a, b", [
+    ("hope", "hoped"),
+    ("dies", "died"),
+    ("anxious", "anxiously"),
+    ("running", "runs"),
+    ("happy", "happiness"),
+])
+def test_stem_matches_word_forms(a, b):
+    assert _stem(a) == _stem(b)
+
+
+def test_stem_keeps_word_root():
+    assert _stem("relational") == "relat"
+    assert _stem("Hoped") == "hope"
+
+
+def test_parse_search_drops_stopwords_and_negated_terms():
+    phrases, stems = _parse_search('the therapist -sad -"bad day" "so happy"')
+    assert phrases == ["so happy"]
+    assert stems == {"therapist"}
+
+
+def test_highlight_marks_stemmed_forms():
+    highlighted, spans = _highlight("I hoped it would pass", "hope")
+    assert highlighted == "I <mark>hoped</mark> it would pass"
+    assert spans == [[2, 7]]
+
+
+def test_highlight_ignores_stopwords():
+    highlighted, _ = _highlight("There then the therapist", "the therapist")
+    assert highlighted == "There then the <mark>therapist</mark>"
+
+
+def test_highlight_skips_negated_terms():
+    highlighted, _ = _highlight("happy not sad", "happy -sad")
+    assert highlighted == "<mark>happy</mark> not sad"
+
+
+def test_highlight_matches_quoted_phrase():
+    highlighted, spans = _highlight("I feel so  happy today", '"so happy" -"today"')
+    assert highlighted == "I feel <mark>so  happy</mark> today"
+    assert spans == [[7, 16]]
+
+
+def test_highlight_merges_overlapping_spans():
+    _, spans = _highlight("feeling calm now", '"feeling calm" calm')
+    assert spans == [[0, 12]]
+
+
+def test_highlight_escapes_html():
+    text = "<script>alert(1)</script> <b>happy</b>"
+    highlighted, spans = _highlight(text, "happy")
+    assert "<script>" not in highlighted and "<b>" not in highlighted
+    assert highlighted == "&lt;script&gt;alert(1)&lt;/script&gt; &lt;b&gt;<mark>happy</mark>&lt;/b&gt;"
+    assert text[spans[0][0]:spans[0][1]] == "happy"
+
+
+def test_highlight_without_usable_terms_returns_escaped_text():
+    assert _highlight("a < b", "the -a") == ("a &lt; b", [])